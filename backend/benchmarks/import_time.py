@@ -0,0 +1,69 @@
+"""Import-time benchmark for the backend, based on `python -X importtime`.
+
+Run from backend/:  python benchmarks/import_time.py
+
+Compares importing the app as it starts today (provider SDKs and parsers
+deferred) with importing it and then calling warm_up(), which is what the
+eager, import-everything-up-front startup cost looks like. Also lists the
+slowest modules and checks that no heavy module is loaded by `import app`.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def measure(code, runs):
+    """Median total import time (seconds) and per-module cumulative times from the last run."""
+    totals = []
+    modules = {}
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                                cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+        total = 0
+        modules = {}
+        for line in result.stderr.splitlines():
+            match = LINE.match(line)
+            if not match:
+                continue
+            cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+            modules[name] = cumulative
+            if indent == 1:  # top-level imports; nested ones are already in their parent's cumulative time
+                total += cumulative
+        totals.append(total / 1e6)
+    return sorted(totals)[len(totals) // 2], modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    lazy, lazy_modules = measure('import app', args.runs)
+    eager, _ = measure('import app; app.warm_up()', args.runs)
+    print(f"import app            {lazy * 1000:8.1f} ms (median of {args.runs})")
+    print(f"import app + warm_up  {eager * 1000:8.1f} ms")
+    print(f"deferred to first use {(eager - lazy) * 1000:8.1f} ms\n")
+
+    print("slowest modules under `import app` (cumulative):")
+    for name, cumulative in sorted(lazy_modules.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    deferred = subprocess.run(
+        [sys.executable, '-c', "import app; print(' '.join(app.PROVIDER_MODULES + app.PARSER_MODULES))"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout.split()
+    heavy = [name for name in deferred if name in lazy_modules]
+    if heavy:
+        print(f"\nheavy modules imported eagerly: {', '.join(heavy)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
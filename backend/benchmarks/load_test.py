@@ -0,0 +1,290 @@
+"""Offline load test of the backend against recorded provider responses.
+
+Run from backend/:
+
+    python benchmarks/load_test.py --users 20 --concurrency 5 --profile realistic --time-scale 0.1
+
+The app is imported in-process with its provider URLs pointed at the local
+stub server in stubs.py and a throwaway SQLite database, then served with
+werkzeug's threaded server. Each simulated user walks the onboarding flow:
+
+    /api/user-input -> /api/question-status (poll) -> /api/questions/<type>
+    -> /api/generate-answer -> /api/generate-quiz-questions (poll) -> /api/resume-analysis (poll)
+
+The report covers throughput, p50/p95/p99 latency per endpoint, SQL
+statements per request (from the app's /api/metrics) and LLM calls per user.
+Nothing leaves the machine, so it runs in CI; it exits non-zero if any user
+flow fails. With `--profile instant` it also fails on any LLM error or on LLM
+calls the app's metrics missed, since nothing should fail without latency or
+injected errors.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from werkzeug.serving import make_server
+
+from stubs import LATENCY_PROFILES, StubServer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RESUME_LINES = [
+    "Jordan Example - Senior Software Engineer",
+    "Experience: Acme Corp (2019-2024) - led migration of the order service to event-driven microservices,",
+    "cutting p95 checkout latency by 40%. Built a Python/Flask API serving 2M requests per day.",
+    "Skills: Python, Go, PostgreSQL, Redis, Kafka, Kubernetes, AWS",
+    "Education: B.S. Computer Science",
+]
+
+
+def make_resume_pdf(lines):
+    """A minimal single-page PDF with one text line per entry, readable by PyPDF2."""
+    def escape(text):
+        return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+    content = "BT /F1 11 Tf 72 720 Td 14 TL " + " ".join(f"({escape(line)}) Tj T*" for line in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        "/Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(content)} >>\nstream\n{content}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = "%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    pdf += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return pdf.encode('latin-1')
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.onboarding = []
+        self.failures = []
+        self.lock = threading.Lock()
+
+    def record(self, endpoint, seconds):
+        with self.lock:
+            self.latencies[endpoint].append(seconds)
+
+
+class UserFlow:
+    def __init__(self, base_url, recorder, args, index):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.args = args
+        self.user_id = f"bench-user-{index}"
+        self.session = requests.Session()
+
+    def call(self, endpoint, method, path, **kwargs):
+        started = time.perf_counter()
+        response = self.session.request(method, self.base_url + path, timeout=60, **kwargs)
+        self.recorder.record(endpoint, time.perf_counter() - started)
+        return response
+
+    def poll(self, endpoint, path, done):
+        deadline = time.monotonic() + self.args.poll_timeout
+        while time.monotonic() < deadline:
+            response = self.call(endpoint, 'GET', path)
+            if done(response):
+                return response
+            time.sleep(self.args.poll_interval)
+        raise TimeoutError(f"{endpoint} did not complete within {self.args.poll_timeout}s")
+
+    def run(self):
+        started = time.perf_counter()
+        response = self.call('/api/user-input', 'POST', '/api/user-input', data={
+            'userId': self.user_id, 'name': 'Bench User', 'email': f"{self.user_id}@example.com",
+            'company': 'Acme', 'role': 'Software Engineer',
+        }, files={'resume': ('resume.pdf', make_resume_pdf(RESUME_LINES), 'application/pdf')})
+        if response.status_code != 202:
+            raise RuntimeError(f"user-input returned {response.status_code}: {response.text}")
+
+        self.poll('/api/question-status', f"/api/question-status?userId={self.user_id}",
+                  lambda r: r.ok and r.json().get('status') == 'complete')
+        self.recorder.onboarding.append(time.perf_counter() - started)
+
+        questions = []
+        for question_type in ('resume', 'role', 'company'):
+            response = self.call('/api/questions/<question_type>', 'GET',
+                                 f"/api/questions/{question_type}?userId={self.user_id}")
+            questions.extend(response.json().get('questions', []))
+        if not questions:
+            raise RuntimeError("no questions were generated")
+
+        for question in questions[:self.args.answers]:
+            response = self.call('/api/generate-answer', 'POST', '/api/generate-answer',
+                                 json={'questionId': question['id']})
+            if not response.ok:
+                raise RuntimeError(f"generate-answer returned {response.status_code}")
+
+        self.poll('/api/generate-quiz-questions', f"/api/generate-quiz-questions?userId={self.user_id}",
+                  lambda r: r.ok and r.json().get('status') == 'completed')
+        self.poll('/api/resume-analysis', f"/api/resume-analysis?userId={self.user_id}",
+                  lambda r: r.status_code == 200 and r.json().get('status') == 'completed')
+
+
+def parse_prometheus(text):
+    samples = defaultdict(float)
+    for line in text.splitlines():
+        match = re.match(r'^(\w+)(?:\{(.*)\})? (\S+)$', line)
+        if not match:
+            continue
+        labels = tuple(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(2) or ''))
+        samples[(match.group(1), labels)] += float(match.group(3))
+    return samples
+
+
+def summarize(recorder, samples, stubs, args, elapsed):
+    report = {'users': args.users, 'concurrency': args.concurrency, 'profile': args.profile,
+              'elapsed_seconds': elapsed, 'failures': list(recorder.failures), 'endpoints': {}}
+
+    total_requests = sum(len(v) for v in recorder.latencies.values())
+    report['requests_per_second'] = total_requests / elapsed if elapsed else 0.0
+    report['users_per_minute'] = (args.users - len(recorder.failures)) / elapsed * 60 if elapsed else 0.0
+    report['onboarding_seconds'] = {f"p{p}": percentile(recorder.onboarding, p) for p in (50, 95, 99)}
+
+    requests_by_route = defaultdict(float)
+    queries_by_route = defaultdict(float)
+    llm_errors = {}
+    for (name, labels), value in samples.items():
+        labels = dict(labels)
+        if name == 'app_http_request_duration_seconds_count':
+            requests_by_route[labels['route']] += value
+        elif name == 'app_db_queries_total':
+            queries_by_route[labels['route']] += value
+        elif name == 'app_llm_calls_total' and labels['outcome'] == 'error':
+            llm_errors[f"{labels['site']}/{labels['model']}"] = value
+
+    for endpoint, latencies in sorted(recorder.latencies.items()):
+        served = requests_by_route.get(endpoint, 0)
+        report['endpoints'][endpoint] = {
+            'requests': len(latencies),
+            **{f"p{p}_ms": percentile(latencies, p) * 1000 for p in (50, 95, 99)},
+            'db_queries_per_request': queries_by_route.get(endpoint, 0) / served if served else None,
+        }
+    report['background_db_queries_per_user'] = queries_by_route.get('background', 0) / args.users
+
+    # Count LLM calls where they arrive; the app's own counter is checked against it below
+    llm_calls = stubs.calls['gemini'] + stubs.calls['groq']
+    recorded = sum(v for (name, _), v in samples.items() if name == 'app_llm_calls_total')
+    report['llm_calls_per_user'] = llm_calls / args.users
+    report['llm_calls_recorded'] = recorded
+    report['llm_errors'] = llm_errors
+    report['provider_calls'] = dict(stubs.calls)
+    report['provider_errors_injected'] = dict(stubs.errors)
+
+    if args.profile == 'instant':
+        # Nothing is slow or injected to fail, so an LLM error means the app and the
+        # stubs disagree (e.g. a fallback quietly covering a broken primary path)
+        for call, count in report['llm_errors'].items():
+            report['failures'].append(f"{count:.0f} LLM calls failed at {call}")
+        if recorded != llm_calls:
+            report['failures'].append(f"app recorded {recorded:.0f} LLM calls, stubs received {llm_calls}")
+    return report
+
+
+def print_report(report):
+    print(f"\n{report['users']} users, concurrency {report['concurrency']}, "
+          f"profile '{report['profile']}', {report['elapsed_seconds']:.1f}s")
+    print(f"throughput: {report['requests_per_second']:.1f} req/s, {report['users_per_minute']:.1f} onboarded users/min")
+    onboarding = report['onboarding_seconds']
+    print(f"onboarding (user-input -> questions ready): p50 {onboarding['p50']:.2f}s  "
+          f"p95 {onboarding['p95']:.2f}s  p99 {onboarding['p99']:.2f}s\n")
+    print(f"{'endpoint':<34}{'reqs':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'SQL/req':>9}")
+    for endpoint, stats in report['endpoints'].items():
+        queries = stats['db_queries_per_request']
+        print(f"{endpoint:<34}{stats['requests']:>6}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}"
+              f"{stats['p99_ms']:>10.1f}{'-' if queries is None else f'{queries:.1f}':>9}")
+    print(f"\nbackground SQL statements per user: {report['background_db_queries_per_user']:.1f}")
+    print(f"LLM calls per user: {report['llm_calls_per_user']:.1f} "
+          f"(app recorded {report['llm_calls_recorded']:.0f} in total)")
+    if report['llm_errors']:
+        print(f"LLM calls that failed (and fell back): {report['llm_errors']}")
+    print(f"provider calls: {report['provider_calls']}  injected errors: {report['provider_errors_injected']}")
+    if report['failures']:
+        print(f"\n{len(report['failures'])} failures:")
+        for failure in report['failures']:
+            print(f"  {failure}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, default=5)
+    parser.add_argument('--profile', choices=sorted(LATENCY_PROFILES), default='realistic')
+    parser.add_argument('--time-scale', type=float, default=0.1,
+                        help='multiplier applied to stub latencies (1.0 = recorded distribution)')
+    parser.add_argument('--answers', type=int, default=3, help='answers requested per user')
+    parser.add_argument('--poll-interval', type=float, default=0.1)
+    parser.add_argument('--poll-timeout', type=float, default=120)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args()
+    if args.json:
+        args.json = os.path.abspath(args.json)
+
+    stubs = StubServer(args.profile, time_scale=args.time_scale, seed=args.seed).start()
+    workdir = tempfile.mkdtemp(prefix='interviewprep-bench-')
+    os.environ.update(stubs.provider_env())
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.chdir(workdir)  # the app writes uploads/ relative to the working directory
+    sys.path.insert(0, BACKEND_DIR)
+
+    import app as backend
+
+    with backend.app.app_context():
+        backend.db.create_all()
+    server = make_server('127.0.0.1', 0, backend.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    recorder = Recorder()
+
+    def run_user(index):
+        try:
+            UserFlow(base_url, recorder, args, index).run()
+        except Exception as e:
+            recorder.failures.append(f"bench-user-{index}: {e}")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(run_user, range(args.users)))
+    elapsed = time.perf_counter() - started
+
+    samples = parse_prometheus(requests.get(f"{base_url}/api/metrics", timeout=10).text)
+    server.shutdown()
+    stubs.shutdown()
+
+    report = summarize(recorder, samples, stubs, args, elapsed)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    sys.exit(1 if report['failures'] else 0)
+
+
+if __name__ == '__main__':
+    main()
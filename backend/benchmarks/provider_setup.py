@@ -0,0 +1,102 @@
+"""Micro-benchmark of per-call provider setup cost, before and after ProviderRegistry.
+
+Run from backend/:  python benchmarks/provider_setup.py
+
+No API keys or network access are needed: model and client construction is
+measured directly, and HTTP connection reuse is measured against a local
+server. Real Serper/Jina calls also pay a TLS handshake per new connection,
+so the gap in production is larger than the one reported here.
+
+The Groq client and the pooled HTTP session are the savings. GenerativeModel
+is listed for comparison only: the registry builds a new one per call, since
+construction is already cheap in google-generativeai 0.5.x.
+"""
+import os
+import sys
+import threading
+import timeit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import google.generativeai as genai
+import requests
+from groq import Groq
+
+from providers import ProviderRegistry
+
+GENERATION_CONFIG = {
+    "temperature": 0.8,
+    "top_p": 0.95,
+    "top_k": 5,
+    "max_output_tokens": 250,
+    "response_mime_type": "text/plain",
+}
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without TCP_NODELAY every
+    # keep-alive response after the first stalls ~40 ms on a delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        body = b'{"organic": []}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def report(label, before, after, number):
+    print(f"{label:<28} before {before / number * 1e6:10.1f} us/call   "
+          f"after {after / number * 1e6:10.1f} us/call   ({before / after:5.1f}x)")
+
+
+def main():
+    genai.configure(api_key="benchmark")
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    os.environ.setdefault("GROQ_API_KEY", "benchmark")
+    registry = ProviderRegistry(groq_timeout=30)
+
+    number = 2000
+    before = timeit.timeit(
+        lambda: genai.GenerativeModel('gemini-1.5-flash-8b', generation_config=GENERATION_CONFIG), number=number)
+    after = timeit.timeit(
+        lambda: registry.gemini_model('gemini-1.5-flash-8b', GENERATION_CONFIG), number=number)
+    report("GenerativeModel", before, after, number)
+
+    number = 200
+    before = timeit.timeit(lambda: Groq(api_key="benchmark", timeout=30), number=number)
+    after = timeit.timeit(registry.groq_client, number=number)
+    report("Groq client", before, after, number)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), OkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+
+    def new_connection():
+        # requests.post without a session opens and tears down a connection per call
+        requests.post(f"http://{host}:{port}/search", data='{"q": "x"}',
+                      headers={'Content-Type': 'application/json'}).json()
+
+    session = registry.http_session()
+
+    def pooled():
+        session.post(f"http://{host}:{port}/search", data='{"q": "x"}',
+                     headers={'Content-Type': 'application/json'}).json()
+
+    number = 500
+    before = timeit.timeit(new_connection, number=number)
+    after = timeit.timeit(pooled, number=number)
+    report("Serper request (local)", before, after, number)
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
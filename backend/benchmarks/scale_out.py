@@ -0,0 +1,182 @@
+"""Job throughput as worker processes are added, against shared storage.
+
+Run from backend/:
+
+    python benchmarks/scale_out.py --jobs 24 --workers 1 2 4 --profile realistic --time-scale 0.05
+
+Every round starts N `worker.py` processes that share one database, one blob
+directory and the stub providers from stubs.py. It then queues a
+question-generation job for each of `--jobs` fresh users (JOB_BACKEND=queue)
+and times how long the workers take to drain the queue. The jobs spend their
+time waiting on providers, so throughput should grow almost linearly with
+the worker count.
+
+The script exits non-zero if any job fails, or if the largest round's
+scaling efficiency is below --min-efficiency. Efficiency is the speedup over
+one worker divided by the worker count.
+
+By default the database is a throwaway SQLite file in WAL mode, the
+file-backed stand-in for a shared database. Pass --database-url to run
+against a real server such as a local Postgres; benchmark rows are left in
+place.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from load_test import RESUME_LINES
+from stubs import LATENCY_PROFILES, StubServer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class WorkerProcess:
+    """A worker.py subprocess whose output is drained in the background."""
+
+    def __init__(self, env, cwd, threads, poll_interval):
+        self.ready = threading.Event()
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.join(BACKEND_DIR, 'worker.py'),
+             '--threads', str(threads), '--poll-interval', str(poll_interval)],
+            cwd=cwd, env=env, stdout=subprocess.PIPE, text=True,
+        )
+        threading.Thread(target=self._drain, daemon=True).start()
+
+    def _drain(self):
+        for line in self.process.stdout:
+            if line.startswith('Worker ') and ' ready ' in line:
+                self.ready.set()
+
+    def stop(self):
+        self.process.terminate()
+        self.process.wait(timeout=60)
+
+
+def run_round(backend, round_index, workers, args, env, workdir):
+    processes = [WorkerProcess(env, workdir, args.threads, args.poll_interval) for _ in range(workers)]
+    try:
+        for worker in processes:
+            if not worker.ready.wait(timeout=60):
+                raise RuntimeError("worker process did not start within 60s")
+
+        user_ids = [f"scale-{round_index}-{i}" for i in range(args.jobs)]
+        started = time.perf_counter()
+        with backend.app.app_context():
+            for i, user_id in enumerate(user_ids):
+                backend.db.session.add(backend.User(
+                    id=user_id, name='Scale User', email=f"{user_id}@example.com",
+                    company=f"Company {i}", role='Software Engineer', resume_text='\n'.join(RESUME_LINES),
+                ))
+                backend.db.session.commit()
+                backend.dispatch_job('questions', user_id, backend.acquire_lease(user_id, 'questions'))
+
+            Job = backend.Job
+            pending = Job.query.filter(Job.user_id.in_(user_ids), Job.status.in_(('queued', 'running')))
+            deadline = time.monotonic() + args.timeout
+            while pending.count():
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"jobs did not finish within {args.timeout}s")
+                time.sleep(0.05)
+                backend.db.session.rollback()  # start a new transaction to see the workers' commits
+            elapsed = time.perf_counter() - started
+
+            # Job functions log and swallow their own errors, so check the result they write
+            generated = backend.User.query.filter(backend.User.id.in_(user_ids),
+                                                  backend.User.questions_generated.is_(True)).count()
+    finally:
+        for worker in processes:
+            worker.stop()
+
+    return {'workers': workers, 'jobs': args.jobs, 'elapsed_seconds': elapsed,
+            'jobs_per_second': args.jobs / elapsed, 'failed': args.jobs - generated}
+
+
+def print_report(report):
+    print(f"\n{report['jobs']} question-generation jobs per round, {report['threads']} thread(s) per worker, "
+          f"profile '{report['profile']}' x{report['time_scale']}, database {report['database']}")
+    print(f"{'workers':>8}{'seconds':>10}{'jobs/s':>9}{'speedup':>9}{'efficiency':>12}{'failed':>8}")
+    for result in report['rounds']:
+        print(f"{result['workers']:>8}{result['elapsed_seconds']:>10.2f}{result['jobs_per_second']:>9.2f}"
+              f"{result['speedup']:>9.2f}{result['efficiency']:>12.0%}{result['failed']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--jobs', type=int, default=24, help='jobs queued per round')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='worker processes per round')
+    parser.add_argument('--threads', type=int, default=1, help='threads per worker process')
+    parser.add_argument('--profile', choices=sorted(LATENCY_PROFILES), default='realistic')
+    parser.add_argument('--time-scale', type=float, default=0.05,
+                        help='multiplier applied to stub latencies (1.0 = recorded distribution)')
+    parser.add_argument('--poll-interval', type=float, default=0.05, help='worker poll interval when idle')
+    parser.add_argument('--timeout', type=float, default=600, help='seconds allowed per round')
+    parser.add_argument('--min-efficiency', type=float, default=0.7)
+    parser.add_argument('--database-url', help='shared database to use instead of a temporary SQLite file')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args()
+    if args.json:
+        args.json = os.path.abspath(args.json)
+
+    stubs = StubServer(args.profile, time_scale=args.time_scale, seed=args.seed).start()
+    workdir = tempfile.mkdtemp(prefix='interviewprep-scale-')
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'shared.db')}"
+    os.environ.update(stubs.provider_env())
+    os.environ.update({
+        'DATABASE_URL': database_url,
+        'JOB_BACKEND': 'queue',
+        'BLOB_STORE_URL': os.path.join(workdir, 'blobs'),
+        # Every job should do the same provider work, however many processes share it
+        'LLM_CACHE_SIZE': '0',
+    })
+    os.chdir(workdir)
+    sys.path.insert(0, BACKEND_DIR)
+
+    import app as backend
+
+    with backend.app.app_context():
+        backend.db.create_all()
+        if database_url.startswith('sqlite'):
+            # WAL lets the workers' reads proceed while another process writes
+            with backend.db.engine.connect() as conn:
+                conn.exec_driver_sql('PRAGMA journal_mode=WAL')
+
+    rounds = []
+    try:
+        for index, workers in enumerate(args.workers):
+            result = run_round(backend, index, workers, args, dict(os.environ), workdir)
+            rounds.append(result)
+            print(f"{workers} worker(s): {result['jobs_per_second']:.2f} jobs/s", flush=True)
+    finally:
+        stubs.shutdown()
+
+    baseline = rounds[0]['jobs_per_second'] / rounds[0]['workers']
+    for result in rounds:
+        result['speedup'] = result['jobs_per_second'] / rounds[0]['jobs_per_second']
+        result['efficiency'] = result['jobs_per_second'] / (baseline * result['workers'])
+
+    report = {'jobs': args.jobs, 'threads': args.threads, 'profile': args.profile, 'time_scale': args.time_scale,
+              'database': 'sqlite (WAL)' if database_url.startswith('sqlite') else database_url.split('://')[0],
+              'rounds': rounds, 'provider_calls': dict(stubs.calls)}
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    largest = max(rounds, key=lambda r: r['workers'])
+    failed = sum(r['failed'] for r in rounds)
+    if failed:
+        print(f"\n{failed} jobs failed")
+    if largest['efficiency'] < args.min_efficiency:
+        print(f"\nscaling efficiency at {largest['workers']} workers is {largest['efficiency']:.0%}, "
+              f"below {args.min_efficiency:.0%}")
+    sys.exit(1 if failed or largest['efficiency'] < args.min_efficiency else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+"""Local stand-ins for Serper, Jina Reader, Gemini and Groq that replay recorded responses.
+
+One threaded HTTP server answers for all four providers, routed by path:
+
+    POST /search                                   Serper
+    GET  /<url>                                    Jina Reader
+    POST /v1beta/models/<model>:generateContent    Gemini (REST transport)
+    POST /v1beta/models/<model>:streamGenerateContent
+    POST /openai/v1/chat/completions               Groq (OpenAI-compatible, SSE when streaming)
+
+Each provider gets a latency distribution and an error rate, so the same
+server doubles as a fault injector for exercising the circuit breakers.
+"""
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name)) as f:
+        return f.read()
+
+
+class Latency:
+    """Log-normal latency defined by its median and p95, in seconds."""
+
+    def __init__(self, median, p95, error_rate=0.0):
+        self.median = median
+        self.sigma = math.log(p95 / median) / 1.645 if median and p95 > median else 0.0
+        self.error_rate = error_rate
+
+    def sample(self, rng):
+        if not self.median:
+            return 0.0
+        return self.median * math.exp(self.sigma * rng.gauss(0, 1))
+
+
+LATENCY_PROFILES = {
+    'instant': {
+        'serper': Latency(0, 0), 'jina': Latency(0, 0), 'gemini': Latency(0, 0), 'groq': Latency(0, 0),
+    },
+    'realistic': {
+        'serper': Latency(0.4, 1.2), 'jina': Latency(0.8, 3.0),
+        'gemini': Latency(1.5, 4.0), 'groq': Latency(0.6, 2.0),
+    },
+    'degraded': {
+        'serper': Latency(0.8, 5.0, error_rate=0.1), 'jina': Latency(2.0, 12.0, error_rate=0.2),
+        'gemini': Latency(3.0, 20.0, error_rate=0.3), 'groq': Latency(0.8, 3.0),
+    },
+}
+
+
+def pick_completion(prompt):
+    """Choose the recorded completion matching one of the app's prompt templates."""
+    if 'Extract all the interview Q&A' in prompt:
+        return load_fixture('gemini_web_qa.txt')
+    if 'Analyze the following resume' in prompt:
+        return load_fixture('gemini_resume_analysis.json')
+    if 'Generate 20 interview questions' in prompt:
+        return load_fixture('gemini_quiz.json')
+    if 'Format the output as a JSON array of strings' in prompt:
+        return load_fixture('groq_questions.json')
+    return load_fixture('gemini_answer.txt')
+
+
+# Injected failures use each provider's own error format, so the SDKs take
+# the same error path they would against the real API
+ERROR_BODIES = {
+    'gemini': {'error': {'code': 503, 'message': 'injected failure', 'status': 'UNAVAILABLE'}},
+    'groq': {'error': {'message': 'injected failure', 'type': 'server_error'}},
+}
+
+
+def split_chunks(text, size=80):
+    return [text[i:i + size] for i in range(0, len(text), size)] or ['']
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without TCP_NODELAY every
+    # request on a pooled keep-alive connection stalls ~40 ms on a delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _provider(self):
+        if self.path.startswith('/search'):
+            return 'serper'
+        if self.path.startswith('/v1beta/'):
+            return 'gemini'
+        if self.path.startswith('/openai/'):
+            return 'groq'
+        return 'jina'
+
+    def _delay_or_fail(self, provider):
+        """Sleep for a sampled latency; returns False if this call should fail instead."""
+        server = self.server
+        with server.lock:
+            server.calls[provider] += 1
+            latency = server.profile[provider]
+            delay = latency.sample(server.rng) * server.time_scale
+            fail = server.rng.random() < latency.error_rate
+        time.sleep(delay)
+        if fail:
+            with server.lock:
+                server.errors[provider] += 1
+            body = ERROR_BODIES.get(provider, {'error': 'injected failure'})
+            self._send(503, 'application/json', json.dumps(body))
+        return not fail
+
+    def _send(self, status, content_type, body):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def do_GET(self):
+        if self._delay_or_fail('jina'):
+            self._send(200, 'text/plain', load_fixture('jina_page.md'))
+
+    def do_POST(self):
+        provider = self._provider()
+        body = self._read_json()
+        if not self._delay_or_fail(provider):
+            return
+        if provider == 'serper':
+            self._send(200, 'application/json', load_fixture('serper_search.json'))
+        elif provider == 'gemini':
+            self._gemini(body)
+        else:
+            self._groq(body)
+
+    def _gemini(self, body):
+        prompt = ''.join(part.get('text', '')
+                         for content in body.get('contents', []) for part in content.get('parts', []))
+        text = pick_completion(prompt)
+        usage = {'promptTokenCount': len(prompt) // 4, 'candidatesTokenCount': len(text) // 4,
+                 'totalTokenCount': (len(prompt) + len(text)) // 4}
+
+        def response(chunk, final):
+            candidate = {'content': {'parts': [{'text': chunk}], 'role': 'model'}, 'index': 0}
+            if final:
+                candidate['finishReason'] = 'STOP'
+            return {'candidates': [candidate], 'usageMetadata': usage}
+
+        if ':streamGenerateContent' in self.path:
+            chunks = split_chunks(text)
+            # The REST transport reads a streamed JSON array of responses
+            payload = [response(chunk, i == len(chunks) - 1) for i, chunk in enumerate(chunks)]
+            self._send(200, 'application/json', json.dumps(payload))
+        else:
+            self._send(200, 'application/json', json.dumps(response(text, True)))
+
+    def _groq(self, body):
+        prompt = ''.join(message.get('content', '') for message in body.get('messages', []))
+        text = pick_completion(prompt)
+        usage = {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(text) // 4,
+                 'total_tokens': (len(prompt) + len(text)) // 4}
+        base = {'id': 'chatcmpl-stub', 'created': int(time.time()), 'model': body.get('model')}
+
+        if not body.get('stream'):
+            self._send(200, 'application/json', json.dumps(dict(
+                base, object='chat.completion', usage=usage,
+                choices=[{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+            )))
+            return
+
+        events = []
+        for chunk in split_chunks(text):
+            events.append(dict(base, object='chat.completion.chunk',
+                               choices=[{'index': 0, 'delta': {'content': chunk}, 'finish_reason': None}]))
+        events.append(dict(base, object='chat.completion.chunk', x_groq={'usage': usage},
+                           choices=[{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]))
+        stream = ''.join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n"
+        self._send(200, 'text/event-stream', stream)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, profile='instant', time_scale=1.0, seed=0, host='127.0.0.1', port=0):
+        super().__init__((host, port), StubHandler)
+        self.profile = LATENCY_PROFILES[profile] if isinstance(profile, str) else profile
+        self.time_scale = time_scale
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = Counter()
+        self.errors = Counter()
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def provider_env(self):
+        """Environment variables that point the app at this server instead of the real providers."""
+        return {
+            'SERPER_URL': f"{self.url}/search",
+            'SERPER_API_KEY': 'stub',
+            'JINA_READER_URL': self.url,
+            'GEMINI_API_ENDPOINT': self.url,
+            'GEMINI_API_KEY': 'stub',
+            'GROQ_BASE_URL': self.url,
+            'GROQ_API_KEY': 'stub',
+        }
@@ -0,0 +1,31 @@
+# gunicorn -c gunicorn.conf.py app:app
+import multiprocessing
+import os
+
+bind = os.getenv('BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# Load the app once in the master and fork workers from it, so the import cost
+# is paid once per host instead of once per worker
+preload_app = True
+
+
+def on_starting(server):
+    # Pull in the provider SDKs and document parsers too. Only modules are
+    # loaded here; clients are still created lazily inside each worker because
+    # gRPC and HTTP connection pools don't survive a fork.
+    from app import warm_up
+    warm_up()
+
+
+def post_fork(server, worker):
+    # Metrics are kept per process, so /api/metrics only shows the worker that
+    # answered. With METRICS_PORT set, each worker also serves its own metrics
+    # on the first free port from METRICS_PORT to METRICS_PORT + workers - 1;
+    # a restarted worker takes over the port its predecessor freed.
+    port = os.getenv('METRICS_PORT')
+    if port:
+        from app import render_metrics
+        from metrics import serve_metrics
+        serve_metrics(render_metrics, int(port), attempts=workers)
@@ -0,0 +1,152 @@
+import json
+
+_WHITESPACE = ' \t\r\n'
+_STRUCTURAL = '[]{},:'
+
+
+class JSONStreamParser:
+    """Incrementally parses JSON from LLM output, tolerating fences, prose and truncation.
+
+    Anything before the first '[' or '{' (```json fences, "Here are your
+    questions:") and anything after the root value closes is ignored. When the
+    root is an array, `feed` returns each element as soon as it is complete, so
+    callers can act on items while the model is still generating. `result`
+    returns the parsed root; a truncated array yields its complete elements and
+    a truncated object is repaired by cutting back to the last complete value
+    and closing any open containers.
+    """
+
+    def __init__(self):
+        self.items = []
+        self.done = False
+        self._text = []
+        self._length = 0
+        self._started = False
+        self._stack = []          # [container, in_value]; in_value only matters for objects
+        self._in_string = False
+        self._escape = False
+        self._in_scalar = False
+        self._element_start = None
+        self._safe_point = None   # (text length, container types) after the last complete value
+
+    def feed(self, chunk):
+        """Consume a chunk of text and return the array elements it completed."""
+        completed = []
+        for char in chunk:
+            if self.done:
+                break
+            if not self._started:
+                if char not in '[{':
+                    continue
+                self._started = True
+            self._text.append(char)
+            self._length += 1
+            self._consume(char, completed)
+        return completed
+
+    def _consume(self, char, completed):
+        pos = self._length - 1  # index of `char` within the captured text
+
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == '\\':
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                if not self._is_key_position():
+                    self._value_completed(pos + 1, completed)
+            return
+
+        if self._in_scalar and (char in _WHITESPACE or char in _STRUCTURAL):
+            self._in_scalar = False
+            self._value_completed(pos, completed)
+
+        if char in _WHITESPACE:
+            return
+
+        if self._at_root_element_boundary() and char not in ',]':
+            self._element_start = pos
+
+        if char == '"':
+            self._in_string = True
+        elif char in '[{':
+            self._stack.append([char, False])
+            self._mark_safe(pos + 1)
+        elif char in ']}':
+            if not self._stack:
+                return
+            self._stack.pop()
+            self._value_completed(pos + 1, completed)
+        elif char == ':':
+            if self._stack and self._stack[-1][0] == '{':
+                self._stack[-1][1] = True
+        elif char == ',':
+            if self._stack and self._stack[-1][0] == '{':
+                self._stack[-1][1] = False
+        elif not self._in_scalar:
+            self._in_scalar = True
+
+    def _is_key_position(self):
+        return bool(self._stack) and self._stack[-1][0] == '{' and not self._stack[-1][1]
+
+    def _at_root_element_boundary(self):
+        return (len(self._stack) == 1 and self._stack[0][0] == '['
+                and self._element_start is None and not self._in_scalar)
+
+    def _mark_safe(self, end):
+        self._safe_point = (end, [container for container, _ in self._stack])
+
+    def _value_completed(self, end, completed):
+        if not self._stack:
+            self.done = True
+            return
+        self._mark_safe(end)
+        if len(self._stack) == 1 and self._stack[0][0] == '[' and self._element_start is not None:
+            text = ''.join(self._text[self._element_start:end])
+            self._element_start = None
+            try:
+                item = json.loads(text)
+            except json.JSONDecodeError:
+                return
+            self.items.append(item)
+            completed.append(item)
+
+    def result(self):
+        """Return the parsed root value, a best-effort repair of it, or None."""
+        if not self._started:
+            return None
+        text = ''.join(self._text)
+        if self.done:
+            try:
+                return json.loads(text)
+            except json.JSONDecodeError:
+                pass
+        if text.startswith('['):
+            # Only whole elements are trusted; a half-written object is dropped
+            return list(self.items)
+        if self._safe_point is None:
+            return None
+        end, containers = self._safe_point
+        closers = ''.join(']' if container == '[' else '}' for container in reversed(containers))
+        repaired = text[:end].rstrip().rstrip(',') + closers
+        try:
+            return json.loads(repaired)
+        except json.JSONDecodeError:
+            return None
+
+
+def parse_json_lenient(text):
+    """Parse the JSON value embedded in `text`, recovering what it can from truncated output."""
+    parser = JSONStreamParser()
+    parser.feed(text)
+    return parser.result()
+
+
+def iter_json_items(chunks):
+    """Yield the elements of a JSON array as they complete in a stream of text chunks."""
+    parser = JSONStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done:
+            break
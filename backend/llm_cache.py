@@ -0,0 +1,256 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+_MINHASH_PRIME = (1 << 61) - 1
+
+
+def normalize_prompt(prompt):
+    # Prompts are built from indented f-strings; layout differences shouldn't change the key
+    return re.sub(r'\s+', ' ', prompt).strip()
+
+
+def _hash64(text):
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class MinHasher:
+    """MinHash signatures over word shingles, with LSH banding for candidate lookup."""
+
+    def __init__(self, num_perm=64, bands=16, shingle_size=5, max_words=5000):
+        self.num_perm = num_perm
+        self.max_words = max_words
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        # Fixed seeds so signatures are comparable across processes
+        self._params = [(2 * i + 1, 7919 * (i + 1)) for i in range(num_perm)]
+
+    def signature(self, text):
+        words = text.lower().split()[:self.max_words]
+        size = min(self.shingle_size, len(words)) or 1
+        shingles = {_hash64(' '.join(words[i:i + size])) for i in range(max(1, len(words) - size + 1))}
+        return tuple(min((a * s + b) % _MINHASH_PRIME for s in shingles) for a, b in self._params)
+
+    def band_keys(self, signature):
+        return [(i, signature[i * self.rows:(i + 1) * self.rows]) for i in range(self.bands)]
+
+    @staticmethod
+    def similarity(sig_a, sig_b):
+        return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+class LLMCache:
+    """In-process LRU cache of LLM responses with a TTL.
+
+    Entries are keyed by model, generation config and a hash of the normalized
+    prompt. Call sites that opt into near-duplicate matching also get a hit when
+    a cached prompt for the same model and config has an estimated Jaccard
+    similarity of at least `similarity_threshold`. Every lookup is also passed
+    to `on_lookup(site, result)`, e.g. to count it in metrics.
+    """
+
+    def __init__(self, max_entries=512, ttl=24 * 60 * 60, similarity_threshold=0.9, on_lookup=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.on_lookup = on_lookup
+        self.minhash = MinHasher()
+        self._entries = OrderedDict()  # key -> (value, expires_at, scope, signature)
+        self._bands = defaultdict(set)  # (scope, band) -> keys
+        self._stats = defaultdict(lambda: {'hits': 0, 'near_hits': 0, 'misses': 0})
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def scope(model, generation_config):
+        return hashlib.sha256(f"{model}\0{json.dumps(generation_config, sort_keys=True)}".encode('utf-8')).hexdigest()
+
+    def key(self, model, generation_config, prompt):
+        scope = self.scope(model, generation_config)
+        return hashlib.sha256(f"{scope}\0{normalize_prompt(prompt)}".encode('utf-8')).hexdigest()
+
+    def get(self, site, model, generation_config, prompt, near_duplicates=False):
+        key = self.key(model, generation_config, prompt)
+        scope = self.scope(model, generation_config)
+        signature = self.minhash.signature(normalize_prompt(prompt)) if near_duplicates else None
+        now = time.time()
+        value, result = None, 'misses'
+        with self._lock:
+            entry = self._live_entry(key, now)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                value, result = entry[0], 'hits'
+            elif signature is not None:
+                match = self._near_match(scope, signature, now)
+                if match is not None:
+                    self._entries.move_to_end(match)
+                    value, result = self._entries[match][0], 'near_hits'
+        self._count(site, result)
+        return value
+
+    def put(self, model, generation_config, prompt, value, near_duplicates=False):
+        key = self.key(model, generation_config, prompt)
+        scope = self.scope(model, generation_config)
+        # Only index entries for near-duplicate lookup when the call site uses it
+        signature = self.minhash.signature(normalize_prompt(prompt)) if near_duplicates else None
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, time.time() + self.ttl, scope, signature)
+            if signature is not None:
+                for band in self.minhash.band_keys(signature):
+                    self._bands[(scope, band)].add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _count(self, site, result):
+        with self._lock:
+            self._stats[site][result] += 1
+        if self.on_lookup is not None:
+            self.on_lookup(site, result)
+
+    def get_or_generate(self, site, model, generation_config, prompt, generate, near_duplicates=False,
+                        is_valid=None):
+        value = self.get(site, model, generation_config, prompt, near_duplicates)
+        if value is None:
+            value = generate()
+            # Never cache empty, failed or (per `is_valid`) unusable generations
+            if value and (is_valid is None or is_valid(value)):
+                self.put(model, generation_config, prompt, value, near_duplicates)
+        return value
+
+    def stats(self):
+        with self._lock:
+            report = {}
+            for site, counts in self._stats.items():
+                lookups = counts['hits'] + counts['near_hits'] + counts['misses']
+                report[site] = dict(counts, hit_rate=(counts['hits'] + counts['near_hits']) / lookups if lookups else 0.0)
+            return {'entries': len(self._entries), 'sites': report}
+
+    def _live_entry(self, key, now):
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] < now:
+            self._remove(key)
+            return None
+        return entry
+
+    def _near_match(self, scope, signature, now):
+        candidates = set()
+        for band in self.minhash.band_keys(signature):
+            candidates |= self._bands.get((scope, band), set())
+        best, best_similarity = None, self.similarity_threshold
+        for key in candidates:
+            entry = self._live_entry(key, now)
+            if entry is None or entry[3] is None:
+                continue
+            similarity = self.minhash.similarity(signature, entry[3])
+            if similarity >= best_similarity:
+                best, best_similarity = key, similarity
+        return best
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None or entry[3] is None:
+            return
+        for band in self.minhash.band_keys(entry[3]):
+            keys = self._bands.get((entry[2], band))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._bands[(entry[2], band)]
+
+
+class RedisLLMCache(LLMCache):
+    """LLMCache stored in Redis, shared by every web and worker process.
+
+    Keys, scopes and MinHash signatures are the same as the in-process cache.
+    Redis owns expiry (each entry is written with the TTL) and eviction, so
+    run it with `maxmemory-policy allkeys-lru` to keep the LRU behaviour.
+    Near-duplicate bands are Redis sets that expire with their entries. Hit and
+    miss counts stay per process. A Redis outage turns lookups into misses
+    instead of failing the request.
+    """
+
+    def __init__(self, url, ttl=24 * 60 * 60, similarity_threshold=0.9, namespace='llm-cache', on_lookup=None):
+        super().__init__(max_entries=0, ttl=ttl, similarity_threshold=similarity_threshold, on_lookup=on_lookup)
+        import redis
+        self.redis = redis.Redis.from_url(url)
+        self.namespace = namespace
+        self._errors = redis.RedisError
+
+    def _entry_key(self, key):
+        return f"{self.namespace}:entry:{key}"
+
+    def _band_key(self, scope, band):
+        index, rows = band
+        return f"{self.namespace}:band:{scope}:{index}:{_hash64(' '.join(map(str, rows)))}"
+
+    def get(self, site, model, generation_config, prompt, near_duplicates=False):
+        key = self.key(model, generation_config, prompt)
+        scope = self.scope(model, generation_config)
+        signature = self.minhash.signature(normalize_prompt(prompt)) if near_duplicates else None
+        try:
+            raw = self.redis.get(self._entry_key(key))
+            if raw is not None:
+                self._count(site, 'hits')
+                return json.loads(raw)['value']
+
+            if signature is not None:
+                match = self._redis_near_match(scope, signature)
+                if match is not None:
+                    self._count(site, 'near_hits')
+                    return match
+        except self._errors:
+            pass
+
+        self._count(site, 'misses')
+        return None
+
+    def put(self, model, generation_config, prompt, value, near_duplicates=False):
+        key = self.key(model, generation_config, prompt)
+        scope = self.scope(model, generation_config)
+        signature = self.minhash.signature(normalize_prompt(prompt)) if near_duplicates else None
+        entry = json.dumps({'value': value, 'signature': signature})
+        try:
+            pipe = self.redis.pipeline()
+            pipe.set(self._entry_key(key), entry, ex=self.ttl)
+            if signature is not None:
+                for band in self.minhash.band_keys(signature):
+                    band_key = self._band_key(scope, band)
+                    pipe.sadd(band_key, key)
+                    pipe.expire(band_key, self.ttl)
+            pipe.execute()
+        except self._errors:
+            pass
+
+    def stats(self):
+        report = super().stats()
+        report['entries'] = None  # held (and evicted) by Redis
+        return report
+
+    def _redis_near_match(self, scope, signature):
+        band_keys = [self._band_key(scope, band) for band in self.minhash.band_keys(signature)]
+        candidates = [member.decode('utf-8') for member in self.redis.sunion(band_keys)]
+        if not candidates:
+            return None
+        best, best_similarity = None, self.similarity_threshold
+        # Band sets can outlive their entries; expired ones come back as None
+        for raw in self.redis.mget([self._entry_key(key) for key in candidates]):
+            if raw is None:
+                continue
+            entry = json.loads(raw)
+            if entry['signature'] is None:
+                continue
+            similarity = self.minhash.similarity(signature, entry['signature'])
+            if similarity >= best_similarity:
+                best, best_similarity = entry['value'], similarity
+        return best
+
+
+def llm_cache_from_url(url=None, max_entries=512, ttl=24 * 60 * 60, on_lookup=None):
+    """The shared Redis cache when LLM_CACHE_URL is set, otherwise an in-process one."""
+    if url:
+        return RedisLLMCache(url, ttl=ttl, on_lookup=on_lookup)
+    return LLMCache(max_entries=max_entries, ttl=ttl, on_lookup=on_lookup)
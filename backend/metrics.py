@@ -0,0 +1,212 @@
+import functools
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from flask import g, request
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(label_key, extra=()):
+    pairs = list(label_key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (f'{k}="' + v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+               for k, v in pairs)
+    return '{' + ','.join(escaped) + '}'
+
+
+class Metrics:
+    """Thread-safe counters, gauges and histograms rendered in Prometheus text format."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._types = {}
+        self._help = {}
+        self._counters = defaultdict(float)
+        self._gauges = {}
+        self._histograms = {}  # (name, labels) -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def describe(self, name, metric_type, help_text):
+        self._types[name] = metric_type
+        self._help[name] = help_text
+
+    def inc(self, name, value=1, **labels):
+        with self._lock:
+            self._counters[(name, _label_key(labels))] += value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    @contextmanager
+    def span(self, stage, **labels):
+        """Time a block of work into app_stage_duration_seconds{stage=...}."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('app_stage_duration_seconds', time.perf_counter() - start, stage=stage, **labels)
+
+    def timed(self, stage):
+        """Decorator form of span() for timing a whole function."""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def render(self):
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            histograms = {key: (list(h[0]), h[1], h[2]) for key, h in self._histograms.items()}
+
+        series = defaultdict(list)
+        for (name, labels), value in sorted(counters.items()):
+            series[name].append(f"{name}{_format_labels(labels)} {value}")
+        for (name, labels), value in sorted(gauges.items()):
+            series[name].append(f"{name}{_format_labels(labels)} {value}")
+        for (name, labels), (bucket_counts, total, count) in sorted(histograms.items()):
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                series[name].append(f"{name}_bucket{_format_labels(labels, [('le', str(bound))])} {bucket_count}")
+            series[name].append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {count}")
+            series[name].append(f"{name}_sum{_format_labels(labels)} {total}")
+            series[name].append(f"{name}_count{_format_labels(labels)} {count}")
+
+        lines = []
+        for name in sorted(series):
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {self._types[name]}")
+            lines.extend(series[name])
+        return '\n'.join(lines) + '\n'
+
+
+class StackSampler:
+    """Samples one thread's call stack at a fixed interval and counts folded stacks.
+
+    The output is in the folded format flamegraph.pl and speedscope read:
+    one "outer;...;inner count" line per distinct stack.
+    """
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = defaultdict(int)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        return self.counts
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.counts[';'.join(reversed(stack))] += 1
+
+    def folded(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in sorted(self.counts.items()))
+
+
+def instrument_app(app, metrics, profile_sample_rate=0.0, profile_dir='profiles'):
+    """Time every request, and profile a sampled fraction of them when profile_sample_rate > 0."""
+    metrics.describe('app_http_request_duration_seconds', 'histogram', 'Flask request latency by route.')
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        if profile_sample_rate and random.random() < profile_sample_rate:
+            g.stack_sampler = StackSampler(threading.get_ident()).start()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop('request_started', None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            metrics.observe('app_http_request_duration_seconds', time.perf_counter() - started,
+                            method=request.method, route=route, status=response.status_code)
+        return response
+
+    @app.teardown_request
+    def write_profile(exc):
+        sampler = g.pop('stack_sampler', None)
+        if sampler is None:
+            return
+        sampler.stop()
+        os.makedirs(profile_dir, exist_ok=True)
+        path = os.path.join(profile_dir, f"{int(time.time() * 1000)}-{request.endpoint or 'unmatched'}.folded")
+        with open(path, 'w') as f:
+            f.write(sampler.folded())
+
+
+def serve_metrics(render, port, host='0.0.0.0', attempts=1):
+    """Serve render() at /metrics from a daemon thread, for processes without a Flask server.
+
+    Binds the first free port from `port` to `port + attempts - 1`, so sibling
+    processes started with the same settings each get a port of their own.
+    Returns the server; its server_address holds the port it bound.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    for candidate in range(port, port + attempts):
+        try:
+            server = ThreadingHTTPServer((host, candidate), MetricsHandler)
+        except OSError:
+            if candidate == port + attempts - 1:
+                raise
+            continue
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
@@ -0,0 +1,76 @@
+import importlib
+import os
+import threading
+
+# Provider SDKs are imported on first use; they account for most of the app's import time
+PROVIDER_MODULES = ('google.generativeai', 'groq', 'requests')
+
+
+class ProviderRegistry:
+    """Builds provider clients once and hands the same instances to every worker thread.
+
+    The Groq client is built once; building one per call costs tens of
+    milliseconds. HTTP calls share one requests.Session whose connection pool
+    keeps Serper and Jina connections warm between requests. Gemini models are
+    not cached: in google-generativeai 0.5.x a GenerativeModel only holds its
+    settings and uses the SDK's shared client, so constructing one per call
+    (about a microsecond) is cheaper than looking it up. SDKs are imported and
+    configured the first time a client is asked for.
+    """
+
+    def __init__(self, groq_timeout=None, gemini_endpoint=None, pool_size=32):
+        self.groq_timeout = groq_timeout
+        self.gemini_endpoint = gemini_endpoint
+        self.pool_size = pool_size
+        self._genai = None
+        self._groq_client = None
+        self._session = None
+        self._lock = threading.RLock()
+
+    def genai(self):
+        if self._genai is None:
+            with self._lock:
+                if self._genai is None:
+                    import google.generativeai as genai
+                    options = {}
+                    if self.gemini_endpoint:
+                        # Alternate endpoint, e.g. the local stub server used by benchmarks/load_test.py
+                        options = {'transport': 'rest', 'client_options': {'api_endpoint': self.gemini_endpoint}}
+                    genai.configure(api_key=os.getenv("GEMINI_API_KEY"), **options)
+                    self._genai = genai
+        return self._genai
+
+    def gemini_model(self, model_name, generation_config):
+        return self.genai().GenerativeModel(model_name, generation_config=generation_config)
+
+    def groq_client(self):
+        if self._groq_client is None:
+            with self._lock:
+                if self._groq_client is None:
+                    from groq import Groq
+                    self._groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"), timeout=self.groq_timeout)
+        return self._groq_client
+
+    def http_session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=self.pool_size)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+        return self._session
+
+
+def preload_modules(modules):
+    """Import modules without creating any clients.
+
+    Used by the gunicorn master before it forks: workers inherit the imported
+    modules, while gRPC/HTTP clients, which are not fork-safe, are still built
+    lazily inside each worker.
+    """
+    for name in modules:
+        importlib.import_module(name)
@@ -0,0 +1,177 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Fails fast once a provider's recent error or slow-call rate crosses a threshold.
+
+    The breaker looks at a rolling window of the last `window` calls. While open,
+    calls raise CircuitOpenError without touching the provider; after
+    `reset_timeout` seconds a single trial call is let through (half-open) and
+    its outcome decides whether the circuit closes again.
+
+    call() wraps a whole call. Callers that time a call themselves, such as a
+    streamed response that is read long after the request opens, check
+    allow() first and must then record() the outcome.
+    """
+
+    def __init__(self, name, slow_call_seconds, failure_rate=0.5, slow_call_rate=0.8,
+                 window=20, min_calls=5, reset_timeout=30):
+        self.name = name
+        self.slow_call_seconds = slow_call_seconds
+        self.failure_rate = failure_rate
+        self.slow_call_rate = slow_call_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self._calls = deque(maxlen=window)  # (succeeded, elapsed seconds)
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+            if self.state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record(self, succeeded, elapsed):
+        with self._lock:
+            if self.state == 'half_open':
+                self._trial_in_flight = False
+                if succeeded and elapsed < self.slow_call_seconds:
+                    self.state = 'closed'
+                    self._calls.clear()
+                else:
+                    self._open()
+                return
+
+            self._calls.append((succeeded, elapsed))
+            if len(self._calls) < self.min_calls:
+                return
+            failures = sum(1 for ok, _ in self._calls if not ok)
+            slow = sum(1 for _, t in self._calls if t >= self.slow_call_seconds)
+            if (failures / len(self._calls) >= self.failure_rate
+                    or slow / len(self._calls) >= self.slow_call_rate):
+                self._open()
+
+    def _open(self):
+        self.state = 'open'
+        self._opened_at = time.monotonic()
+        self._calls.clear()
+
+    def call(self, fn, *args, **kwargs):
+        if not self.allow():
+            raise CircuitOpenError(f"Circuit for {self.name} is open")
+        start = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.record(False, time.monotonic() - start)
+            raise
+        self.record(True, time.monotonic() - start)
+        return result
+
+    def latency_percentile(self, pct, default):
+        """Latency percentile of recent successful calls, or `default` without enough samples."""
+        with self._lock:
+            latencies = sorted(t for ok, t in self._calls if ok)
+        if len(latencies) < self.min_calls:
+            return default
+        return latencies[min(len(latencies) - 1, int(pct * len(latencies)))]
+
+
+class Hedger:
+    """Runs hedged calls on a bounded pool of threads.
+
+    A call runs its first attempt on a pool thread. If that attempt is still
+    running `hedge_delay` seconds after it started, a second identical attempt
+    is fired, and the first successful result wins. Attempts never wait in a
+    queue. When every thread is busy, the call runs in the caller's thread
+    without a hedge. A hedge that finds no free thread is skipped. Size the
+    pool at two threads per concurrent caller.
+
+    The losing attempt can't be interrupted mid-request. Once it finishes, its
+    result is handed to `close` so connections go back to the pool. `fn` must
+    be safe to run twice (idempotent reads only).
+    """
+
+    def __init__(self, max_workers=16):
+        self.max_workers = max_workers
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def call(self, fn, hedge_delay, close=None):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='hedge')
+                self._slots = threading.BoundedSemaphore(self.max_workers)
+
+        started = threading.Event()
+
+        def first_attempt():
+            started.set()
+            return fn()
+
+        first = self._start(first_attempt)
+        if first is None:
+            return fn()
+
+        # The hedge delay counts from when the first attempt starts running
+        started.wait()
+        done, pending = wait({first}, timeout=hedge_delay)
+        if not done:
+            hedge = self._start(fn)
+            if hedge is not None:
+                pending.add(hedge)
+
+        error = None
+        while True:
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        self._discard(loser, close)
+                    return future.result()
+                error = future.exception()
+            if not pending:
+                raise error
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+    def _start(self, fn):
+        """Run `fn` on a free pool thread; returns its future, or None when every thread is busy."""
+        if not self._slots.acquire(blocking=False):
+            return None
+        future = self._executor.submit(fn)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    @staticmethod
+    def _discard(future, close):
+        if close is None:
+            return
+
+        def close_result(f):
+            if not f.cancelled() and f.exception() is None:
+                close(f.result())
+        future.add_done_callback(close_result)
+
+
+def call_with_fallback(primary, fallback, logger=None):
+    try:
+        return primary()
+    except Exception as e:
+        if logger:
+            logger.warning(f"Primary provider failed, falling back: {e}")
+        return fallback()
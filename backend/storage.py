@@ -0,0 +1,71 @@
+import io
+import os
+import tempfile
+from urllib.parse import urlparse
+
+
+class LocalBlobStore:
+    """Blobs as files under one directory.
+
+    On a single host this is the old uploads/ folder; for several hosts, point
+    it at a shared volume (NFS, EFS, a bind mount). Writes go through a temp
+    file and a rename so readers on other nodes never see a partial upload.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        path = os.path.abspath(os.path.join(self.root, key))
+        if os.path.dirname(path) != os.path.abspath(self.root):
+            raise ValueError(f"Invalid blob key: {key}")
+        return path
+
+    def put(self, key, data):
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return key
+
+    def open(self, key):
+        return open(self._path(key), 'rb')
+
+
+class S3BlobStore:
+    """Blobs in an S3-compatible bucket (AWS, MinIO, ...); needs boto3."""
+
+    def __init__(self, bucket, prefix='', endpoint_url=None):
+        import boto3
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client('s3', endpoint_url=endpoint_url)
+
+    def put(self, key, data):
+        self.client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data)
+        return key
+
+    def open(self, key):
+        response = self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)
+        return io.BytesIO(response['Body'].read())
+
+
+def blob_store_from_url(url):
+    """Build a blob store from BLOB_STORE_URL: a directory path, file:///path or s3://bucket/prefix."""
+    parsed = urlparse(url)
+    if parsed.scheme == 's3':
+        prefix = parsed.path.lstrip('/')
+        if prefix and not prefix.endswith('/'):
+            prefix += '/'
+        return S3BlobStore(parsed.netloc, prefix, endpoint_url=os.getenv('S3_ENDPOINT_URL'))
+    if parsed.scheme == 'file':
+        return LocalBlobStore(parsed.path)
+    if parsed.scheme:
+        raise ValueError(f"Unsupported blob store URL: {url}")
+    return LocalBlobStore(url)
@@ -0,0 +1,128 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as backend
+from app import Job, JobLease, User, acquire_lease, db, release_lease, rerun_requested, start_job
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # Queue jobs in the database instead of starting threads, so dispatches can be inspected
+    monkeypatch.setattr(backend, 'JOB_BACKEND', 'queue')
+    app = backend.create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'BLOB_STORE_URL': str(tmp_path)})
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(id='u1', name='Test User', email='u1@example.com',
+                            role='Software Engineer', company='Acme', resume_text='Python'))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def lease(job_type='questions'):
+    db.session.expire_all()
+    return JobLease.query.filter_by(user_id='u1', job_type=job_type).one()
+
+
+def expire(job_type='questions'):
+    held = lease(job_type)
+    held.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+
+def queued_tokens():
+    return [job.lease_token for job in Job.query.filter_by(user_id='u1', status='queued').order_by(Job.id)]
+
+
+def test_second_acquire_is_refused(app):
+    token = acquire_lease('u1', 'questions')
+    assert token
+    assert acquire_lease('u1', 'questions') is None
+    assert acquire_lease('u1', 'quiz')  # other job types have their own slot
+    assert lease().owner == token
+
+
+def test_released_lease_can_be_acquired_again(app):
+    token = acquire_lease('u1', 'questions')
+    release_lease('u1', 'questions', token)
+    assert lease().owner is None
+    assert acquire_lease('u1', 'questions') not in (None, token)
+
+
+def test_expired_lease_is_taken_over(app):
+    token = acquire_lease('u1', 'questions')
+    expire()
+    new_token = acquire_lease('u1', 'questions')
+    assert new_token not in (None, token)
+
+    # The old holder's release no longer frees the slot
+    release_lease('u1', 'questions', token)
+    assert lease().owner == new_token
+
+
+def test_expired_lease_with_queued_job_is_not_taken_over(app):
+    assert start_job('u1', 'questions') == 'started'
+    expire()
+    assert acquire_lease('u1', 'questions') is None
+
+    Job.query.filter_by(user_id='u1').update({'status': 'completed'})
+    db.session.commit()
+    assert acquire_lease('u1', 'questions')
+
+
+def test_rerun_requested_while_running_dispatches_again_on_release(app):
+    assert start_job('u1', 'questions') == 'started'
+    token = lease().owner
+    assert not rerun_requested('u1', 'questions', token)
+
+    assert start_job('u1', 'questions', rerun=True) == 'rerun'
+    assert rerun_requested('u1', 'questions', token)
+
+    release_lease('u1', 'questions', token)
+    held = lease()
+    assert held.owner == token and not held.rerun
+    assert queued_tokens() == [token, token]
+
+    release_lease('u1', 'questions', token)
+    assert lease().owner is None
+    assert len(queued_tokens()) == 2
+
+
+def test_start_job_without_rerun_reports_in_progress(app):
+    assert start_job('u1', 'questions') == 'started'
+    assert start_job('u1', 'questions') == 'in_progress'
+    assert not lease().rerun
+
+
+def test_identical_user_input_retry_does_not_request_a_rerun(app):
+    client = app.test_client()
+    form = {'userId': 'u2', 'name': 'Retry User', 'email': 'u2@example.com',
+            'company': 'Acme', 'role': 'Data Engineer'}
+    assert client.post('/api/user-input', data=form).status_code == 202
+    assert client.post('/api/user-input', data=form).status_code == 202
+
+    held = JobLease.query.filter_by(user_id='u2', job_type='questions').one()
+    assert not held.rerun
+    assert Job.query.filter_by(user_id='u2').count() == 1
+
+    response = client.post('/api/user-input', data=dict(form, role='Platform Engineer'))
+    assert 'regenerated' in response.get_json()['message']
+    db.session.expire_all()
+    assert JobLease.query.filter_by(user_id='u2', job_type='questions').one().rerun
+
+
+def test_identical_profile_update_does_not_request_a_rerun(app):
+    client = app.test_client()
+    assert start_job('u1', 'questions') == 'started'
+
+    client.post('/api/update-profile', data={'userId': 'u1', 'company': 'Acme', 'role': 'Software Engineer'})
+    assert not lease().rerun
+
+    client.post('/api/update-profile', data={'userId': 'u1', 'company': 'Globex', 'role': 'Software Engineer'})
+    assert lease().rerun
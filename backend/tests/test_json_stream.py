@@ -0,0 +1,61 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from json_stream import JSONStreamParser, iter_json_items, parse_json_lenient
+
+
+def feed_in_chunks(text, size):
+    parser = JSONStreamParser()
+    completed = []
+    for i in range(0, len(text), size):
+        completed.extend(parser.feed(text[i:i + size]))
+    return parser, completed
+
+
+def test_fenced_output_with_prose():
+    text = 'Here is the analysis:\n```json\n{"resume_score": 82, "strong_points": ["Python"]}\n```\nHope it helps!'
+    assert parse_json_lenient(text) == {'resume_score': 82, 'strong_points': ['Python']}
+
+
+def test_array_items_are_returned_as_they_complete():
+    text = '```json\n["What is a closure?", {"question": "Pick one", "options": {"A": "x"}}, 42]\n```'
+    for size in (1, 3, 7, len(text)):
+        parser, completed = feed_in_chunks(text, size)
+        assert completed == ['What is a closure?', {'question': 'Pick one', 'options': {'A': 'x'}}, 42]
+        assert parser.done
+
+
+def test_truncated_array_keeps_only_complete_items():
+    text = '[{"question": "First?", "correctAnswer": "A"}, {"question": "Seco'
+    parser, completed = feed_in_chunks(text, 5)
+    assert completed == [{'question': 'First?', 'correctAnswer': 'A'}]
+    assert not parser.done
+    assert parser.result() == [{'question': 'First?', 'correctAnswer': 'A'}]
+
+
+def test_truncated_object_is_cut_back_to_the_last_complete_value():
+    assert parse_json_lenient('{"resume_score": 75, "improvements": ["Add metrics", "Shorten') == {
+        'resume_score': 75, 'improvements': ['Add metrics'],
+    }
+    assert parse_json_lenient('{"resume_score": 75, "improvements": [') == {'resume_score': 75, 'improvements': []}
+    assert parse_json_lenient('{"resume_score": 7') == {}
+
+
+def test_escaped_quotes_and_brackets_inside_strings():
+    text = r'["Explain \"[x for x in y]\" in Python", "Path C:\\{temp}\\", "a, b: c"]'
+    assert list(iter_json_items([text[:10], text[10:25], text[25:]])) == [
+        'Explain "[x for x in y]" in Python', 'Path C:\\{temp}\\', 'a, b: c',
+    ]
+
+
+def test_text_after_the_root_value_is_ignored():
+    parser = JSONStreamParser()
+    assert parser.feed('["a", "b"] and then ["c"]') == ['a', 'b']
+    assert parser.done
+    assert parser.result() == ['a', 'b']
+
+
+def test_no_json_returns_none():
+    assert parse_json_lenient('Sorry, I cannot help with that.') is None
@@ -0,0 +1,167 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import llm_cache
+from llm_cache import LLMCache, MinHasher
+
+MODEL = 'gemini-1.5-flash-8b'
+CONFIG = {'temperature': 0.5, 'max_output_tokens': 500}
+WORDS = ['python', 'closure', 'decorator', 'generator', 'interview', 'latency', 'database', 'index',
+         'thread', 'process', 'cache', 'queue', 'lease', 'worker', 'stream', 'token', 'schema',
+         'migration', 'replica', 'shard', 'request', 'response', 'timeout', 'retry']
+
+
+def page(seed, length=400):
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(WORDS) + str(rng.randrange(50)) for _ in range(length))
+
+
+def edit(text, fraction, seed=1):
+    """Replace `fraction` of the words, as a scraped page that changed between crawls would."""
+    rng = random.Random(seed)
+    words = text.split()
+    for i in rng.sample(range(len(words)), int(len(words) * fraction)):
+        words[i] = f"changed{i}"
+    return ' '.join(words)
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(llm_cache.time, 'time', clock)
+    return clock
+
+
+def test_exact_hit_ignores_prompt_layout():
+    cache = LLMCache()
+    cache.put(MODEL, CONFIG, 'Extract the Q&A:\n    some text', 'answer')
+    assert cache.get('web_qa', MODEL, CONFIG, 'Extract the Q&A: some text') == 'answer'
+    assert cache.stats()['sites']['web_qa'] == {'hits': 1, 'near_hits': 0, 'misses': 0, 'hit_rate': 1.0}
+
+
+def test_exact_hit_is_scoped_to_model_and_config():
+    cache = LLMCache()
+    cache.put(MODEL, CONFIG, 'prompt', 'answer')
+    assert cache.get('web_qa', 'llama3-70b-8192', CONFIG, 'prompt') is None
+    assert cache.get('web_qa', MODEL, dict(CONFIG, temperature=0.9), 'prompt') is None
+
+
+def test_minhash_similarity_tracks_the_edited_fraction():
+    minhash = MinHasher()
+    text = page(0)
+    assert minhash.similarity(minhash.signature(text), minhash.signature(text)) == 1.0
+    assert minhash.similarity(minhash.signature(text), minhash.signature(edit(text, 0.005))) >= 0.9
+    assert minhash.similarity(minhash.signature(text), minhash.signature(edit(text, 0.2))) < 0.5
+
+
+def test_near_duplicate_above_the_threshold_hits():
+    cache = LLMCache()
+    text = page(0)
+    cache.put(MODEL, CONFIG, text, 'extracted', near_duplicates=True)
+    assert cache.get('web_qa', MODEL, CONFIG, edit(text, 0.005), near_duplicates=True) == 'extracted'
+    assert cache.stats()['sites']['web_qa']['near_hits'] == 1
+
+
+def test_near_duplicate_below_the_threshold_misses():
+    cache = LLMCache()
+    text = page(0)
+    cache.put(MODEL, CONFIG, text, 'extracted', near_duplicates=True)
+    assert cache.get('web_qa', MODEL, CONFIG, edit(text, 0.2), near_duplicates=True) is None
+    assert cache.get('web_qa', MODEL, CONFIG, page(1), near_duplicates=True) is None
+
+
+def test_near_duplicates_only_for_sites_that_opt_in():
+    cache = LLMCache()
+    text = page(0)
+    cache.put(MODEL, CONFIG, text, 'indexed', near_duplicates=True)
+    assert cache.get('quiz', MODEL, CONFIG, edit(text, 0.005)) is None
+
+    # Entries stored without a signature are never near-duplicate candidates
+    other = page(2)
+    cache.put(MODEL, CONFIG, other, 'exact only')
+    assert cache.get('web_qa', MODEL, CONFIG, edit(other, 0.005), near_duplicates=True) is None
+
+
+def test_near_duplicate_lookup_stays_within_the_scope():
+    cache = LLMCache()
+    text = page(0)
+    cache.put(MODEL, CONFIG, text, 'extracted', near_duplicates=True)
+    assert cache.get('web_qa', MODEL, dict(CONFIG, temperature=0.9), edit(text, 0.005),
+                     near_duplicates=True) is None
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = LLMCache(ttl=60)
+    text = page(0)
+    cache.put(MODEL, CONFIG, text, 'extracted', near_duplicates=True)
+
+    clock.now += 59
+    assert cache.get('web_qa', MODEL, CONFIG, text) == 'extracted'
+
+    clock.now += 2
+    assert cache.get('web_qa', MODEL, CONFIG, edit(text, 0.005), near_duplicates=True) is None
+    assert cache.get('web_qa', MODEL, CONFIG, text) is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LLMCache(max_entries=2)
+    cache.put(MODEL, CONFIG, 'first', 1)
+    cache.put(MODEL, CONFIG, 'second', 2)
+    assert cache.get('web_qa', MODEL, CONFIG, 'first') == 1  # now the most recently used
+
+    cache.put(MODEL, CONFIG, 'third', 3)
+    assert cache.get('web_qa', MODEL, CONFIG, 'second') is None
+    assert cache.get('web_qa', MODEL, CONFIG, 'first') == 1
+    assert cache.get('web_qa', MODEL, CONFIG, 'third') == 3
+
+
+def test_evicted_entries_leave_the_near_duplicate_index():
+    cache = LLMCache(max_entries=1)
+    text = page(0)
+    cache.put(MODEL, CONFIG, text, 'evicted', near_duplicates=True)
+    cache.put(MODEL, CONFIG, page(1), 'kept', near_duplicates=True)
+    assert cache.get('web_qa', MODEL, CONFIG, edit(text, 0.005), near_duplicates=True) is None
+    assert all(cache._entries.keys() >= keys for keys in cache._bands.values())
+
+
+def test_get_or_generate_caches_only_valid_responses():
+    cache = LLMCache()
+    responses = iter(['not json', '{"resume_score": 80}', 'unused'])
+
+    def generate():
+        return next(responses)
+
+    def is_valid(text):
+        return text.startswith('{')
+
+    assert cache.get_or_generate('resume_analysis', MODEL, CONFIG, 'p', generate, is_valid=is_valid) == 'not json'
+    assert cache.get_or_generate('resume_analysis', MODEL, CONFIG, 'p', generate,
+                                 is_valid=is_valid) == '{"resume_score": 80}'
+    assert cache.get_or_generate('resume_analysis', MODEL, CONFIG, 'p', generate,
+                                 is_valid=is_valid) == '{"resume_score": 80}'
+    assert cache.stats()['sites']['resume_analysis']['hits'] == 1
+
+
+def test_every_lookup_is_reported():
+    lookups = []
+    cache = LLMCache(on_lookup=lambda site, result: lookups.append((site, result)))
+    text = page(0)
+    cache.get('web_qa', MODEL, CONFIG, text, near_duplicates=True)
+    cache.put(MODEL, CONFIG, text, 'extracted', near_duplicates=True)
+    cache.get('web_qa', MODEL, CONFIG, text, near_duplicates=True)
+    cache.get('web_qa', MODEL, CONFIG, edit(text, 0.005), near_duplicates=True)
+    assert lookups == [('web_qa', 'misses'), ('web_qa', 'hits'), ('web_qa', 'near_hits')]
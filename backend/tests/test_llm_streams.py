@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import record_llm_stream
+from resilience import CircuitBreaker, CircuitOpenError
+
+
+def make_breaker(**overrides):
+    options = dict(slow_call_seconds=10, window=2, min_calls=2)
+    options.update(overrides)
+    return CircuitBreaker('test', **options)
+
+
+def stream(breaker, open_stream):
+    return record_llm_stream('test-model', 'test', breaker, open_stream, str, lambda chunk: None)
+
+
+def test_streams_that_break_partway_open_the_breaker():
+    breaker = make_breaker()
+
+    def broken():
+        yield 'partial'
+        raise ConnectionError('stream reset')
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            list(stream(breaker, broken))
+    assert breaker.state == 'open'
+
+    opened = []
+    with pytest.raises(CircuitOpenError):
+        next(stream(breaker, lambda: opened.append(1) or iter(['never'])))
+    assert opened == []
+
+
+def test_slow_streams_open_the_breaker():
+    breaker = make_breaker(slow_call_seconds=0.01)
+
+    def slow():
+        yield 'first'
+        time.sleep(0.02)
+        yield 'second'
+
+    for _ in range(2):
+        assert list(stream(breaker, slow)) == ['first', 'second']
+    assert breaker.state == 'open'
+
+
+def test_completed_and_closed_streams_count_as_successes():
+    breaker = make_breaker()
+    assert list(stream(breaker, lambda: iter(['a', 'b']))) == ['a', 'b']
+
+    chunks = stream(breaker, lambda: iter(['a', 'b']))
+    assert next(chunks) == 'a'
+    chunks.close()
+    assert breaker.state == 'closed'
+    assert breaker.latency_percentile(0.5, default=None) is not None
+
+
+def test_stream_is_not_opened_until_iterated():
+    breaker = make_breaker(reset_timeout=0)
+
+    def unreachable():
+        raise ConnectionError('provider down')
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            list(stream(breaker, unreachable))
+    assert breaker.state == 'open'
+
+    # A stream that is created but never read must not hold the half-open trial
+    stream(breaker, lambda: iter(['unused']))
+    assert list(stream(breaker, lambda: iter(['trial']))) == ['trial']
+    assert breaker.state == 'closed'
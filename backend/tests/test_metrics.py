@@ -0,0 +1,61 @@
+import os
+import socket
+import sys
+import urllib.error
+import urllib.request
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import Metrics, serve_metrics
+
+
+@pytest.fixture
+def metrics():
+    metrics = Metrics()
+    metrics.describe('jobs_total', 'counter', 'Jobs run.')
+    metrics.inc('jobs_total', job='questions')
+    return metrics
+
+
+def test_render_includes_type_and_labels(metrics):
+    text = metrics.render()
+    assert '# TYPE jobs_total counter' in text
+    assert 'jobs_total{job="questions"} 1' in text
+
+
+def test_serve_metrics_serves_the_rendered_text(metrics):
+    server = serve_metrics(metrics.render, 0, host='127.0.0.1')
+    try:
+        host, port = server.server_address
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+            assert response.headers['Content-Type'].startswith('text/plain')
+            assert response.read().decode('utf-8') == metrics.render()
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"http://{host}:{port}/other")
+        assert error.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_serve_metrics_skips_ports_in_use(metrics):
+    taken = socket.socket()
+    taken.bind(('127.0.0.1', 0))
+    taken.listen()
+    port = taken.getsockname()[1]
+    try:
+        with pytest.raises(OSError):
+            serve_metrics(metrics.render, port, host='127.0.0.1')
+
+        try:
+            server = serve_metrics(metrics.render, port, host='127.0.0.1', attempts=2)
+        except OSError:
+            pytest.skip(f"port {port + 1} is in use too")
+        assert server.server_address[1] == port + 1
+        server.shutdown()
+        server.server_close()
+    finally:
+        taken.close()
@@ -0,0 +1,253 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import resilience
+from resilience import CircuitBreaker, CircuitOpenError, Hedger, call_with_fallback
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilience.time, 'monotonic', clock)
+    return clock
+
+
+def make_breaker(**overrides):
+    options = dict(slow_call_seconds=1.0, failure_rate=0.5, slow_call_rate=0.8,
+                   window=4, min_calls=4, reset_timeout=30)
+    options.update(overrides)
+    return CircuitBreaker('test', **options)
+
+
+def succeed(clock, elapsed=0.1):
+    def fn():
+        clock.now += elapsed
+        return 'ok'
+    return fn
+
+
+def fail(clock, elapsed=0.1):
+    def fn():
+        clock.now += elapsed
+        raise ConnectionError('provider down')
+    return fn
+
+
+def test_breaker_opens_on_error_rate(clock):
+    breaker = make_breaker()
+    for fn in (succeed(clock), fail(clock), succeed(clock)):
+        try:
+            breaker.call(fn)
+        except ConnectionError:
+            pass
+    assert breaker.state == 'closed'  # fewer than min_calls so far
+
+    with pytest.raises(ConnectionError):
+        breaker.call(fail(clock))
+    assert breaker.state == 'open'
+
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: calls.append(1))
+    assert calls == []
+
+
+def test_breaker_opens_on_slow_call_rate(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.call(succeed(clock, elapsed=1.5))
+    assert breaker.state == 'closed'
+    breaker.call(succeed(clock, elapsed=1.5))
+    assert breaker.state == 'open'
+
+
+def test_breaker_stays_closed_below_thresholds(clock):
+    breaker = make_breaker()
+    for fn in (succeed(clock), succeed(clock, elapsed=1.5), fail(clock), succeed(clock), succeed(clock)):
+        try:
+            breaker.call(fn)
+        except ConnectionError:
+            pass
+    assert breaker.state == 'closed'
+
+
+def open_breaker(breaker, clock):
+    for _ in range(4):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail(clock))
+    assert breaker.state == 'open'
+
+
+def test_half_open_trial_success_closes(clock):
+    breaker = make_breaker()
+    open_breaker(breaker, clock)
+
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.call(succeed(clock))
+
+    clock.now += 1
+    assert breaker.call(succeed(clock)) == 'ok'
+    assert breaker.state == 'closed'
+
+
+@pytest.mark.parametrize('trial', [fail, lambda clock: succeed(clock, elapsed=1.5)])
+def test_half_open_trial_failure_or_slow_call_reopens(clock, trial):
+    breaker = make_breaker()
+    open_breaker(breaker, clock)
+
+    clock.now += 30
+    try:
+        breaker.call(trial(clock))
+    except ConnectionError:
+        pass
+    assert breaker.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        breaker.call(succeed(clock))
+
+
+def test_half_open_allows_a_single_trial(clock):
+    breaker = make_breaker()
+    open_breaker(breaker, clock)
+    clock.now += 30
+
+    def trial():
+        with pytest.raises(CircuitOpenError):
+            breaker.call(succeed(clock))
+        return 'ok'
+
+    assert breaker.call(trial) == 'ok'
+    assert breaker.state == 'closed'
+
+
+def test_latency_percentile_needs_enough_samples(clock):
+    breaker = make_breaker(window=10)
+    for elapsed in (0.1, 0.2, 0.3):
+        breaker.call(succeed(clock, elapsed))
+    assert breaker.latency_percentile(0.95, default=5) == 5
+
+    for elapsed in (0.4, 0.5):
+        breaker.call(succeed(clock, elapsed))
+    assert breaker.latency_percentile(0.95, default=5) == pytest.approx(0.5)
+
+
+def test_hedger_returns_first_attempt_without_hedging():
+    hedger = Hedger(max_workers=2)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        return 'first'
+
+    assert hedger.call(fn, hedge_delay=5) == 'first'
+    assert calls == [1]
+
+
+def test_hedge_wins_and_the_slow_attempt_is_closed():
+    hedger = Hedger(max_workers=2)
+    release_first = threading.Event()
+    attempts = []
+    lock = threading.Lock()
+    closed = []
+    closed_event = threading.Event()
+
+    def fn():
+        with lock:
+            attempt = len(attempts)
+            attempts.append(attempt)
+        if attempt == 0:
+            release_first.wait(5)
+        return f"attempt-{attempt}"
+
+    def close(result):
+        closed.append(result)
+        closed_event.set()
+
+    assert hedger.call(fn, hedge_delay=0.01, close=close) == 'attempt-1'
+    assert closed == []  # the loser is still running
+    release_first.set()
+    assert closed_event.wait(5)
+    assert closed == ['attempt-0']
+
+
+def test_hedge_covers_a_failing_first_attempt():
+    hedger = Hedger(max_workers=2)
+    fail_first = threading.Event()
+    attempts = []
+    lock = threading.Lock()
+
+    def fn():
+        with lock:
+            attempt = len(attempts)
+            attempts.append(attempt)
+        if attempt == 0:
+            fail_first.wait(5)
+            raise ConnectionError('first attempt failed')
+        fail_first.set()
+        return 'hedge'
+
+    assert hedger.call(fn, hedge_delay=0.01) == 'hedge'
+
+
+def test_hedger_raises_when_every_attempt_fails():
+    hedger = Hedger(max_workers=2)
+
+    def fn():
+        raise ConnectionError('provider down')
+
+    with pytest.raises(ConnectionError):
+        hedger.call(fn, hedge_delay=0.01)
+
+
+def test_hedge_is_skipped_without_a_free_thread():
+    hedger = Hedger(max_workers=1)
+    calls = []
+
+    def fn():
+        calls.append(threading.current_thread().name)
+        threading.Event().wait(0.05)
+        return 'first'
+
+    assert hedger.call(fn, hedge_delay=0.01) == 'first'
+    assert len(calls) == 1 and calls[0].startswith('hedge')
+
+
+def test_call_runs_inline_when_the_pool_is_full():
+    hedger = Hedger(max_workers=1)
+    busy = threading.Event()
+    release = threading.Event()
+
+    def occupy():
+        busy.set()
+        release.wait(5)
+        return 'background'
+
+    background = threading.Thread(target=lambda: hedger.call(occupy, hedge_delay=5))
+    background.start()
+    try:
+        assert busy.wait(5)
+        assert hedger.call(lambda: threading.current_thread(), hedge_delay=0.01) is threading.current_thread()
+    finally:
+        release.set()
+        background.join()
+
+
+def test_call_with_fallback():
+    def broken():
+        raise ConnectionError('primary down')
+
+    assert call_with_fallback(lambda: 'primary', lambda: 'fallback') == 'primary'
+    assert call_with_fallback(broken, lambda: 'fallback') == 'fallback'
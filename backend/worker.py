@@ -0,0 +1,118 @@
+"""Background job worker for scale-out mode.
+
+    JOB_BACKEND=queue DATABASE_URL=postgresql://... python worker.py --threads 4
+
+With JOB_BACKEND=queue the web processes store background jobs (question
+generation, resume analysis, quiz generation) in the Job table instead of
+starting threads. Any number of these workers, on any host that shares the
+database, claim jobs from it under a lease and run the same job functions the
+web process would. A worker renews the lease while a job runs; if the worker
+dies, the lease expires and another worker picks the job up. SIGTERM or
+SIGINT stop claiming new jobs and let the running ones finish.
+
+The jobs' metrics (provider latency, tokens, stages, queue wait, cache
+lookups) are recorded in this process. With --metrics-port it serves them
+at /metrics for Prometheus to scrape.
+"""
+import argparse
+import os
+import signal
+import socket
+import threading
+from datetime import timezone
+
+from app import (JOB_HANDLERS, JOB_RUN_LEASE_SECONDS, app, claim_job, fail_abandoned_jobs, finish_job,
+                 jina_hedger, render_metrics, renew_job, warm_up)
+from metrics import serve_metrics
+
+
+class Heartbeat:
+    """Renews the job's lease, and the user's JobLease it holds, while the job runs."""
+
+    def __init__(self, job_id, worker_id, interval=JOB_RUN_LEASE_SECONDS / 3):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            with app.app_context():
+                try:
+                    if not renew_job(self.job_id, self.worker_id):
+                        app.logger.warning(f"Lost the lease on job {self.job_id}; another worker has taken it over")
+                        return
+                except Exception as e:
+                    app.logger.error(f"Failed to renew the lease on job {self.job_id}: {e}")
+
+
+def run_jobs(worker_id, stopping, poll_interval, job_types=None):
+    while not stopping.is_set():
+        with app.app_context():
+            try:
+                job = claim_job(worker_id, job_types)
+                if job is None:
+                    fail_abandoned_jobs()
+                else:
+                    job_id, job_type, user_id, lease_token = job.id, job.job_type, job.user_id, job.lease_token
+                    queued_at = job.created_at.replace(tzinfo=timezone.utc).timestamp()
+            except Exception as e:
+                app.logger.error(f"Worker {worker_id} failed to claim a job: {e}")
+                job = None
+
+        if job is None:
+            stopping.wait(poll_interval)
+            continue
+
+        status = 'completed'
+        with Heartbeat(job_id, worker_id):
+            try:
+                JOB_HANDLERS[job_type](app, user_id, lease_token, queued_at)
+            except Exception as e:
+                app.logger.error(f"Job {job_id} ({job_type}) for user {user_id} failed: {e}")
+                status = 'failed'
+
+        with app.app_context():
+            finish_job(job_id, worker_id, status)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--threads', type=int, default=int(os.getenv('WORKER_THREADS', 4)),
+                        help='jobs run concurrently by this process')
+    parser.add_argument('--poll-interval', type=float, default=1.0, help='seconds to wait when the queue is empty')
+    parser.add_argument('--job-type', action='append', choices=sorted(JOB_HANDLERS),
+                        help='only run jobs of this type (repeatable; default: all)')
+    parser.add_argument('--metrics-port', type=int, default=int(os.getenv('WORKER_METRICS_PORT', 0)),
+                        help='serve this process\'s metrics at :PORT/metrics (default: off)')
+    args = parser.parse_args()
+
+    warm_up()
+    jina_hedger.max_workers = 2 * args.threads  # before the first fetch creates the pool
+    if args.metrics_port:
+        serve_metrics(render_metrics, args.metrics_port)
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    signal.signal(signal.SIGINT, lambda *_: stopping.set())
+
+    name = f"{socket.gethostname()}-{os.getpid()}"
+    threads = [threading.Thread(target=run_jobs, args=(f"{name}-{i}", stopping, args.poll_interval, args.job_type))
+               for i in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    print(f"Worker {name} ready with {args.threads} threads", flush=True)
+    for thread in threads:
+        thread.join()
+
+
+if __name__ == '__main__':
+    main()